@@ -10,7 +10,7 @@ from cryptoscrap.scraper import Scraper
 # Load config from environment
 path_data = os.getenv('PATH_DATA', "/data")
 delay_start = int(os.getenv('DELAY_START', 5 * 60))
-delay_between_scrap = int(os.getenv('DELAY_BETWEEN_SCRAP', 3600))
+workers = int(os.getenv('WORKERS', 4))
 refresh_rate = int(os.getenv('REFRESH_RATE', 3600 * 24))
 
 # Set logger
@@ -33,15 +33,12 @@ s = Scraper(path_data, logger=log)
 to_curr = ["USD", "BTC"]
 random.shuffle(to_curr)
 
-# Check and Scrap
-if s.check_for_updates("minute", to_curr[0], dt.timedelta(days=1)):
-        log.info("New data available for %s market" % to_curr[0])
-        s.scrap('minute', to_curr[0], verbose=0)
-        time.sleep(delay_between_scrap)
-
-if s.check_for_updates("minute", to_curr[1], dt.timedelta(days=1)):
-        log.info("New data available for %s market" % to_curr[1])
-        s.scrap('minute', to_curr[1], verbose=0)
+# Check and Scrap all the markets in a single pass
+outdated = [curr for curr in to_curr
+            if s.check_for_updates("minute", curr, dt.timedelta(days=1))]
+if outdated:
+    log.info("New data available for %s markets" % "/".join(outdated))
+    s.scrap('minute', outdated, verbose=0, workers=workers)
 
 
 # Perform updates at refresh_rate
@@ -52,6 +49,4 @@ while True:
 
     # Scrap
     random.shuffle(to_curr)
-    s.scrap('minute', to_curr[0], verbose=0)
-    time.sleep(delay_between_scrap)
-    s.scrap('minute', to_curr[1], verbose=0)
+    s.scrap('minute', to_curr, verbose=0, workers=workers)
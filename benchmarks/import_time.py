@@ -0,0 +1,66 @@
+"""
+Import-time benchmark of the cryptoscrap API modules.
+
+Each module is imported in a fresh interpreter, several times, and the
+median import time is reported. The script fails if an API module loads
+pandas, or if its import takes longer than the budget.
+
+    python benchmarks/import_time.py [--repeat 7] [--budget 0.5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = ["cryptoscrap.history", "cryptoscrap.price", "cryptoscrap.social",
+           "cryptoscrap.scraper"]
+# Modules that must import with the HTTP dependency only
+LIGHT_MODULES = ["cryptoscrap.history", "cryptoscrap.price",
+                 "cryptoscrap.social"]
+HEAVY_MODULES = ["pandas", "numpy"]
+SNIPPET = """
+import sys, time
+t = time.perf_counter()
+import %s
+print(time.perf_counter() - t)
+print(",".join(m for m in %r if m in sys.modules))
+"""
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module):
+    """Return the import time of a module, and the heavy modules it loaded"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.check_output([sys.executable, "-c",
+                                   SNIPPET % (module, HEAVY_MODULES)],
+                                  env=env, universal_newlines=True)
+    seconds, loaded = out.splitlines()
+    return float(seconds), [m for m in loaded.split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="max import time of a light module (s)")
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        results = [import_time(module) for _ in range(args.repeat)]
+        median = statistics.median(seconds for seconds, _ in results)
+        loaded = results[-1][1]
+        status = "ok"
+        if module in LIGHT_MODULES and loaded:
+            status = "FAIL: loads %s" % ", ".join(loaded)
+        elif module in LIGHT_MODULES and median > args.budget:
+            status = "FAIL: over %.3fs budget" % args.budget
+        failed = failed or status != "ok"
+        print("%-22s %8.1f ms  %s" % (module, median * 1000, status))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+REMOTE_SERVER = "min-api.cryptocompare.com"  # probed only while unhealthy
+REMOTE_PORT = 443
+REQUEST_TIMEOUT = 30  # seconds
+FAILURE_THRESHOLD = 3  # consecutive network failures before the breaker opens
+POOL_SIZE = 16  # kept-alive connections per host, shared by all threads
+MAX_CALLS_PER_SECOND = 15  # CryptoCompare rate limit, shared by all threads
+
+
+class ConnectionMonitor():
+    """
+    Track the connectivity to CryptoCompare passively, from the outcome of
+    the real API requests.
+
+    The monitor acts as a circuit breaker: after `failure_threshold`
+    consecutive network failures the state switches to unhealthy and every
+    thread calling `wait` is paused together. While unhealthy, a single
+    thread probes the remote server until it becomes reachable again.
+    """
+    def __init__(self, hostname=REMOTE_SERVER, port=REMOTE_PORT,
+                 failure_threshold=FAILURE_THRESHOLD):
+        self.hostname = hostname
+        self.port = port
+        self.failure_threshold = failure_threshold
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._healthy = threading.Event()
+        self._healthy.set()
+
+    @property
+    def healthy(self):
+        return self._healthy.is_set()
+
+    def record_success(self):
+        """Close the breaker after a successful request."""
+        with self._lock:
+            self._failures = 0
+            self._healthy.set()
+
+    def record_failure(self):
+        """Count a network failure, and open the breaker if needed."""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._healthy.clear()
+
+    def wait(self, check_rate, log=None):
+        """
+        Block until the connection is healthy. Return immediately (no network
+        round-trip) if it already is.
+
+        :param check_rate: delay in seconds between two probes
+        :param log: optional logger
+        """
+        while not self._healthy.is_set():
+            # Only one thread probes, the others wait for the breaker to close
+            if self._probe_lock.acquire(False):
+                try:
+                    if is_connected(self.hostname, self.port):
+                        self.record_success()
+                        break
+                finally:
+                    self._probe_lock.release()
+                if log is not None:
+                    log.info("No internet connection. Trying again in %d "
+                             "min..." % int(check_rate / 60))
+            self._healthy.wait(check_rate)
+
+
+class RateLimiter():
+    """
+    Space out the API calls of all the threads, so that they stay under
+    `calls_per_second` altogether. Set it to None to disable the limit.
+    """
+    def __init__(self, calls_per_second=MAX_CALLS_PER_SECOND):
+        self.calls_per_second = calls_per_second
+        self._next_call = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the next call is allowed."""
+        if not self.calls_per_second:
+            return
+        with self._lock:
+            now = time.time()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + \
+                1.0 / self.calls_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SingleFlight():
+    """
+    Coalesce concurrent identical calls: while a call for a key is in
+    flight, the other callers of the same key wait for it, and share its
+    result (or exception) instead of issuing their own call.
+    """
+    def __init__(self):
+        self.calls = 0  # calls actually performed
+        self.coalesced = 0  # calls served by a call already in flight
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Return func(), shared with the concurrent calls of the key."""
+        with self._lock:
+            flight = self._in_flight.get(key)
+            if flight is None:
+                flight = self._in_flight[key] = _Flight()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+        return flight.result
+
+    def stats(self):
+        """Return the calls and coalesced counters."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced}
+
+
+class _Flight():
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+monitor = ConnectionMonitor()
+rate_limiter = RateLimiter()
+single_flight = SingleFlight()
+
+# Shared session, so that every API module and worker thread reuses the
+# same kept-alive connections
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE,
+                                      pool_maxsize=POOL_SIZE))
+session.mount("http://", HTTPAdapter(pool_connections=POOL_SIZE,
+                                     pool_maxsize=POOL_SIZE))
+
+
+def get(url):
+    """
+    GET an API url under the shared rate limit, and report the outcome to
+    the connection monitor. HTTP errors still count as a success: the server
+    is reachable.
+
+    :return: requests.Response
+    """
+    rate_limiter.acquire()
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+    except (requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout):
+        monitor.record_failure()
+        raise
+    monitor.record_success()
+    return response
+
+
+def get_json(url):
+    """
+    GET and parse an API url. Concurrent requests of the same url share a
+    single HTTP call and the same parsed object, which must not be mutated.
+
+    :return: parsed json, or False if the status code is not 200
+    """
+    return single_flight.do(url, lambda: __fetch_json(url))
+
+
+def coalescing_stats():
+    """
+    Return the number of API calls performed, and of calls coalesced with
+    an identical call already in flight.
+
+    :return: dict
+    """
+    return single_flight.stats()
+
+
+def __fetch_json(url):
+    raw_data = get(url)
+    raw_data.encoding = 'utf-8'
+    if raw_data.status_code != 200:
+        raw_data.raise_for_status()
+        return False
+    try:
+        return raw_data.json()
+    except ValueError:
+        raise ValueError('Cannot parse to json.')
+
+
+def is_connected(hostname, port=REMOTE_PORT):
+    """Check if the host is reachable"""
+    try:
+        # see if we can resolve the host name -- tells us if there is
+        # a DNS listening
+        host = socket.gethostbyname(hostname)
+        # connect to the host -- tells us if the host is actually
+        # reachable
+        socket.create_connection((host, port), 2).close()
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from . import storage
+from .lazy import LazyModule
+from .logs import default_logger
+from .price import coin_list
+from .social import social_stats, mining_equipment
+
+pd = LazyModule("pandas")
+
+
+SOCIAL_SECTIONS = ["General", "CryptoCompare", "Twitter", "Reddit",
+                   "Facebook"]
+CODE_REPOSITORY_FIELDS = ["stars", "forks", "subscribers", "size",
+                          "open_total_issues", "closed_total_issues",
+                          "open_pull_issues", "closed_pull_issues"]
+SNAPSHOT_FORMAT = '%Y%m%dT%H%M%S'
+
+
+class SnapshotCollector():
+    """
+    Collector to snapshot the CryptoCompare social stats of all the coins,
+    and the mining equipment, into timestamped parquet files.
+    """
+    def __init__(self, path_root, workers=8, logger=None):
+        """
+        :param path_root: path where the parquet files will be saved
+        :param workers: number of social stats requests sent concurrently,
+                        still under the shared API rate limit
+        """
+        # Set the storing paths
+        self.path_root = path_root
+        self.path_social = os.path.join(path_root, "social")
+        self.path_mining = os.path.join(path_root, "mining")
+        self.workers = workers
+
+        # Log to stdout if no logger is given
+        self.log = logger if logger is not None else default_logger()
+
+        # Create missing directory
+        for directory in [self.path_social, self.path_mining]:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+    def collect_social(self, coin_ids=None):
+        """
+        Fetch the social stats of several coins concurrently, one row per
+        coin (see flatten_social for the columns).
+
+        :param coin_ids: dict {symbol: coin id}, all the coins of coin_list()
+                         if None
+        :return: pandas.DataFrame
+        """
+        if coin_ids is None:
+            coin_ids = {symbol: coin["Id"]
+                        for symbol, coin in coin_list()["Data"].items()}
+
+        def fetch(item):
+            symbol, coin_id = item
+            try:
+                row = flatten_social(social_stats(coin_id))
+            except Exception as e:
+                self.log.error("Failed to collect social stats of %s: %s"
+                               % (symbol, str(e)))
+                return None
+            row["symbol"] = symbol
+            row["coin_id"] = str(coin_id)
+            return row
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            rows = [row for row in executor.map(fetch, coin_ids.items())
+                    if row is not None]
+        self.log.info("Collected social stats of %d/%d coins"
+                      % (len(rows), len(coin_ids)))
+        return self.__to_table(rows)
+
+    def collect_mining(self):
+        """
+        Fetch the mining equipment, one row per equipment.
+
+        :return: pandas.DataFrame
+        """
+        raw = mining_equipment()
+        equipments = raw.get("MiningData") or raw.get("Data") or {}
+        rows = [{key: value for key, value in equipment.items()
+                 if not isinstance(value, (dict, list))}
+                for equipment in equipments.values()]
+        return self.__to_table(rows)
+
+    def snapshot_social(self, coin_ids=None):
+        """
+        Collect the social stats and save them in a new snapshot file.
+
+        :return: path of the snapshot
+        """
+        return self.__save(self.collect_social(coin_ids), self.path_social)
+
+    def snapshot_mining(self):
+        """
+        Collect the mining equipment and save it in a new snapshot file.
+
+        :return: path of the snapshot
+        """
+        return self.__save(self.collect_mining(), self.path_mining)
+
+    def load_social(self):
+        """
+        Load the history of all the social snapshots.
+
+        :return: pandas.DataFrame
+        """
+        return self.__load(self.path_social)
+
+    def load_mining(self):
+        """
+        Load the history of all the mining equipment snapshots.
+
+        :return: pandas.DataFrame
+        """
+        return self.__load(self.path_mining)
+
+    @staticmethod
+    def __to_table(rows):
+        # Numeric columns are stored as numbers, the others as strings, so
+        # that each column has a single type in the parquet file
+        df = pd.DataFrame(rows)
+        for col in df.columns:
+            numeric = pd.to_numeric(df[col], errors="coerce")
+            if numeric.notna().sum() == df[col].notna().sum():
+                df[col] = numeric
+            else:
+                df[col] = df[col].astype("string")
+        return df
+
+    def __save(self, df, directory):
+        snapshot_time = pd.Timestamp.now(tz="UTC").floor("s").tz_localize(None)
+        df.insert(0, "snapshot_time", snapshot_time)
+
+        # Never overwrite a snapshot taken in the same second
+        name = snapshot_time.strftime(SNAPSHOT_FORMAT)
+        with storage.create_new(directory, name, ".parquet", "xb") as f:
+            df.to_parquet(f, index=False)
+        return f.name
+
+    def __load(self, directory):
+        files = sorted(f for f in os.listdir(directory)
+                       if f.endswith(".parquet"))
+        if not files:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(os.path.join(directory, f))
+                          for f in files], axis=0, ignore_index=True)
+
+
+# Utils
+def flatten_social(data):
+    """
+    Flatten the social stats of a coin into a single level dict. The scalar
+    fields of each section become "<section>_<field>" columns, and the code
+    repositories are summed up into "coderepository_<field>" columns.
+
+    :param data: social_stats() result
+    :return: dict
+    """
+    row = {}
+    for section in SOCIAL_SECTIONS:
+        for key, value in (data.get(section) or {}).items():
+            if not isinstance(value, (dict, list)):
+                row[section.lower() + "_" + key.lower()] = value
+
+    repositories = (data.get("CodeRepository") or {}).get("List") or []
+    row["coderepository_count"] = len(repositories)
+    for field in CODE_REPOSITORY_FIELDS:
+        row["coderepository_" + field] = sum(
+            __to_number(repository.get(field)) for repository in repositories)
+    return row
+
+
+def __to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
@@ -1,4 +1,4 @@
-import requests
+from . import client
 
 __histominuteurl = 'https://min-api.cryptocompare.com/data/histominute?'
 __histohoururl = 'https://min-api.cryptocompare.com/data/histohour?'
@@ -101,15 +101,9 @@ def __get_price(base_url, from_curr, to_curr, e=None, extra_params=None,
 
 
 def __get_url(url):
-    raw_data = requests.get(url)
-    raw_data.encoding = 'utf-8'
-    if raw_data.status_code != 200:
-        raw_data.raise_for_status()
+    data = client.get_json(url)
+    if data is False:
         return False
-    try:
-        if raw_data.json()['Response'] != "Success":
-            raise ValueError('Cryptocompare API Error: %s'
-                             % raw_data.json()['Message'])
-        return raw_data.json()['Data']
-    except NameError:
-        raise ValueError('Cannot parse to json.')
+    if data['Response'] != "Success":
+        raise ValueError('Cryptocompare API Error: %s' % data['Message'])
+    return data['Data']
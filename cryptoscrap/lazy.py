@@ -0,0 +1,27 @@
+import importlib
+
+
+class LazyModule():
+    """
+    Placeholder for an optional module, imported on the first attribute
+    access. It keeps the import of the cryptoscrap modules light when the
+    module is not used.
+    """
+    def __init__(self, name, extra=None):
+        """
+        :param name: name of the module to import
+        :param extra: cryptoscrap extra installing the module
+        """
+        self.__name = name
+        self.__extra = extra
+        self.__module = None
+
+    def __getattr__(self, attr):
+        if self.__module is None:
+            try:
+                self.__module = importlib.import_module(self.__name)
+            except ImportError:
+                raise ImportError("%s is required for this feature "
+                                  "(pip install cryptoscrap[%s])"
+                                  % (self.__name, self.__extra or self.__name))
+        return getattr(self.__module, attr)
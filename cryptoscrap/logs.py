@@ -0,0 +1,27 @@
+import sys
+import logging
+import threading
+
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_lock = threading.Lock()
+_handler = None
+
+
+def default_logger():
+    """
+    Return the root logger, printing the INFO messages to stdout. The stdout
+    handler is added once, however many scrapers, collectors or pollers are
+    created without a logger.
+    """
+    global _handler
+    log = logging.getLogger()
+    with _lock:
+        log.setLevel(logging.INFO)
+        if _handler is None or _handler not in log.handlers:
+            _handler = logging.StreamHandler(sys.stdout)
+            _handler.setLevel(logging.INFO)
+            _handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            log.addHandler(_handler)
+    return log
@@ -0,0 +1,192 @@
+import os
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+
+from . import client
+from . import storage
+from .logs import default_logger
+from .price import price_multi_full
+
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Tick csv columns, and their price_multi_full RAW field
+TICK_FIELDS = [("lastupdate", "LASTUPDATE"),
+               ("price", "PRICE"),
+               ("open24hour", "OPEN24HOUR"),
+               ("high24hour", "HIGH24HOUR"),
+               ("low24hour", "LOW24HOUR"),
+               ("volume24hour", "VOLUME24HOUR"),
+               ("volume24hourto", "VOLUME24HOURTO"),
+               ("lastvolume", "LASTVOLUME"),
+               ("lastvolumeto", "LASTVOLUMETO")]
+TICK_HEADER = ["time"] + [name for name, _ in TICK_FIELDS]
+LATENCY_WINDOW = 1000  # number of polls kept for the latency stats
+
+
+class PricePoller():
+    """
+    Poller to record the live CryptoCompare prices of baskets of markets
+    into append-only tick csv files, at a sub-minute cadence.
+
+    Each basket is polled with a single price_multi_full call. A quote that
+    did not change since the previous poll is not stored again. The ticks
+    are buffered in memory and flushed in micro-batches, one block per
+    market file.
+    """
+    def __init__(self, path_root, baskets, interval=10, flush_size=500,
+                 flush_interval=60, max_buffer=10000, compression=None,
+                 logger=None):
+        """
+        :param path_root: path where the tick files will be saved
+        :param baskets: list of (from_currs, to_currs) lists, for instance
+                        [(["BTC", "ETH"], ["USD", "EUR"])]
+        :param interval: seconds between two polls of the baskets
+        :param flush_size: number of buffered ticks triggering a flush
+        :param flush_interval: max seconds between two flushes
+        :param max_buffer: max number of ticks kept in memory, the oldest
+                           are dropped if they cannot be flushed
+        :param compression: None (plain csv), "gzip" or "zstd"
+        """
+        # Check the polling fits in the shared API rate limit
+        budget = client.rate_limiter.calls_per_second
+        if budget and len(baskets) > budget * interval:
+            raise ValueError("Polling %d baskets every %ss exceeds the rate "
+                             "limit of %s calls/s" % (len(baskets), interval,
+                                                      budget))
+        storage.extension(compression)  # fail early on unknown compression
+
+        self.path_tick = os.path.join(path_root, "tick")
+        self.baskets = baskets
+        self.interval = interval
+        self.flush_size = min(flush_size, max_buffer)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.compression = compression
+
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {"polls": 0, "ticks": 0, "duplicates": 0,
+                      "flushes": 0, "dropped": 0, "errors": 0}
+        self._buffer = defaultdict(list)  # market -> list of csv lines
+        self._buffered = 0
+        self._last_quote = {}  # market -> last stored quote
+        self._last_flush = time.time()
+
+        # Log to stdout if no logger is given
+        self.log = logger if logger is not None else default_logger()
+
+        # Create missing directory
+        if not os.path.exists(self.path_tick):
+            os.makedirs(self.path_tick)
+
+    def run(self, duration=None):
+        """
+        Poll the baskets at a fixed cadence, until duration (in seconds) is
+        elapsed or a KeyboardInterrupt. Polls that cannot keep up with the
+        cadence are skipped, not queued. The buffer is flushed on exit.
+        """
+        start = time.time()
+        next_poll = start
+        try:
+            while duration is None or time.time() - start < duration:
+                self.poll_once()
+                next_poll += self.interval
+                delay = next_poll - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_poll = time.time()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.flush()
+
+    def poll_once(self):
+        """Poll every basket once, and flush if needed."""
+        for from_currs, to_currs in self.baskets:
+            poll_start = time.time()
+            try:
+                data = price_multi_full(list(from_currs), list(to_currs))
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.log.error("Failed to poll %s-%s: %s"
+                               % (",".join(from_currs), ",".join(to_currs),
+                                  str(e)))
+                continue
+            self.__buffer_quotes(data.get("RAW", {}), poll_start)
+            self.latencies.append(time.time() - poll_start)
+            self.stats["polls"] += 1
+
+        if self._buffered >= self.flush_size or \
+                time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered ticks to their market files."""
+        written = False
+        for market in list(self._buffer):
+            lines = self._buffer[market]
+            if not lines:
+                del self._buffer[market]
+                continue
+            path = os.path.join(self.path_tick, market + storage.extension(
+                self.compression))
+            if not os.path.isfile(path):
+                lines = [",".join(TICK_HEADER) + "\n"] + lines
+            try:
+                storage.append(path, "".join(lines), self.compression)
+            except (IOError, OSError) as e:
+                self.log.error("Failed to flush ticks of %s: %s"
+                               % (market, str(e)))
+                continue
+            self._buffered -= len(self._buffer.pop(market))
+            written = True
+        self._last_flush = time.time()
+        if written:
+            self.stats["flushes"] += 1
+
+        # Keep the memory bounded if some markets could not be flushed
+        while self._buffered > self.max_buffer:
+            market = max(self._buffer, key=lambda m: len(self._buffer[m]))
+            excess = min(self._buffered - self.max_buffer,
+                         len(self._buffer[market]))
+            del self._buffer[market][:excess]
+            self._buffered -= excess
+            self.stats["dropped"] += excess
+
+    def latency(self):
+        """
+        Return the end-to-end poll latency stats (request sent to ticks
+        buffered) over the last polls, in seconds.
+
+        :return: dict
+        """
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {}
+        return {"last": self.latencies[-1],
+                "mean": sum(latencies) / len(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[int(len(latencies) * 0.95)],
+                "max": latencies[-1]}
+
+    def __buffer_quotes(self, raw, poll_time):
+        tick_time = datetime.fromtimestamp(int(poll_time), timezone.utc) \
+            .strftime(DATE_FORMAT)
+        for from_curr, quotes in raw.items():
+            for to_curr, quote in quotes.items():
+                market = from_curr + "-" + to_curr
+                values = tuple(quote.get(field) for _, field in TICK_FIELDS)
+                if self._last_quote.get(market) == values:
+                    self.stats["duplicates"] += 1
+                    continue
+                self._last_quote[market] = values
+                self._buffer[market].append(
+                    ",".join([tick_time] + ["" if v is None else str(v)
+                                            for v in values]) + "\n")
+                self._buffered += 1
+                self.stats["ticks"] += 1
+
+        # Flush early rather than growing past the memory bound
+        if self._buffered >= self.max_buffer:
+            self.flush()
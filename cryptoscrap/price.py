@@ -1,4 +1,4 @@
-import requests
+from . import client
 
 __cl_url = 'https://www.cryptocompare.com/api/data/coinlist/'
 __p_url = 'https://min-api.cryptocompare.com/data/price?'
@@ -290,14 +290,10 @@ def __get_top_pairs(base_url, from_curr, to_curr, limit, sign):
 
 
 def __get_url(url):
-    raw_data = requests.get(url)
-    raw_data.encoding = 'utf-8'
-    if raw_data.status_code != 200:
-        raw_data.raise_for_status()
+    data = client.get_json(url)
+    if data is False:
         return False
-    try:
-        if raw_data.json()['Response'] != "Success":
-            raise ValueError('Cryptocompare API Error: %s' % raw_data.json()['Message'])
-        return raw_data.json()
-    except NameError:
-        raise ValueError('Cannot parse to json.')
+    # Some endpoints (price, pricemulti...) only set Response on errors
+    if data.get('Response', "Success") != "Success":
+        raise ValueError('Cryptocompare API Error: %s' % data['Message'])
+    return data
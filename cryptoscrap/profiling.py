@@ -0,0 +1,172 @@
+import os
+import time
+import logging
+import threading
+from collections import namedtuple, defaultdict
+from datetime import datetime, timezone
+
+from . import storage
+
+
+# Event sent to the Scraper hooks at the end of each phase of a market.
+# A last event with phase "run" (and market None) closes each scrap() call.
+# bytes is the size written on disk, after compression.
+PhaseEvent = namedtuple("PhaseEvent", ["rate", "market", "phase", "seconds",
+                                       "pages", "rows", "bytes"])
+PHASES = ["connectivity", "load", "fetch", "trim", "merge", "write"]
+REPORT_FORMAT = '%Y%m%dT%H%M%S'  # UTC
+
+
+def emit(hooks, event, log=None):
+    """
+    Send an event to the hooks. A failing hook is logged, and never
+    interrupts the scraping.
+    """
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as e:
+            (log or logging.getLogger()).error(
+                "Profiling hook %r failed: %s" % (hook, str(e)))
+
+
+class PhaseTimer():
+    """
+    Context manager timing a phase, and sending its PhaseEvent to the hooks.
+    The pages, rows and bytes counters are filled by the timed code.
+    """
+    def __init__(self, hooks, rate, market, phase, log=None):
+        self.hooks = hooks
+        self.log = log
+        self.rate = rate
+        self.market = market
+        self.phase = phase
+        self.pages = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        event = PhaseEvent(self.rate, self.market, self.phase,
+                           time.perf_counter() - self._start,
+                           self.pages, self.rows, self.bytes)
+        emit(self.hooks, event, self.log)
+        return False
+
+
+class NullPhaseTimer():
+    """PhaseTimer used when there is no hook: it records nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __getattr__(self, name):
+        return 0
+
+
+NULL_PHASE_TIMER = NullPhaseTimer()
+
+
+class ProfileCollector():
+    """
+    Scraper hook collecting the phase events. It reports the slowest markets
+    with their dominant phase, and the time spent in each phase.
+
+    If a directory is given, a report is written there at the end of every
+    scrap() run, and the events are reset.
+    """
+    def __init__(self, directory=None, top=20):
+        """
+        :param directory: where to write the per-run reports, or None
+        :param top: number of slowest markets in the reports
+        """
+        self.directory = directory
+        self.top = top
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event.phase == "run":
+            if self.directory is not None:
+                self.write_report(event.seconds)
+            return
+        with self._lock:
+            self.events.append(event)
+
+    def report(self, run_seconds=None):
+        """
+        Return the profile report of the collected events.
+
+        :param run_seconds: wall time of the run, if known
+        :return: str
+        """
+        with self._lock:
+            events = list(self.events)
+        return self.__format(events, run_seconds)
+
+    def write_report(self, run_seconds=None):
+        """
+        Write the report in the directory, and reset the events. Reports
+        never overwrite each other.
+
+        :return: path of the report
+        """
+        with self._lock:
+            events, self.events = self.events, []
+        report = self.__format(events, run_seconds)
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        name = "profile-%s" % datetime.now(timezone.utc).strftime(
+            REPORT_FORMAT)
+        with storage.create_new(self.directory, name, ".txt") as f:
+            f.write(report)
+        return f.name
+
+    def __format(self, events, run_seconds):
+        markets = defaultdict(lambda: defaultdict(float))
+        totals = defaultdict(lambda: [0.0, 0, 0, 0])
+        for e in events:
+            markets[(e.rate, e.market)][e.phase] += e.seconds
+            total = totals[e.phase]
+            total[0] += e.seconds
+            total[1] += e.pages
+            total[2] += e.rows
+            total[3] += e.bytes
+        busy = sum(total[0] for total in totals.values()) or 1
+
+        lines = ["Scraping profile: %d markets, %.1f s spent in phases"
+                 % (len(markets), busy)]
+        if run_seconds is not None:
+            lines[0] += ", %.1f s wall time" % run_seconds
+
+        lines.append("")
+        lines.append("Phases:")
+        phases = sorted(totals, key=lambda p: PHASES.index(p)
+                        if p in PHASES else len(PHASES))
+        for phase in phases:
+            seconds, pages, rows, size = totals[phase]
+            lines.append("  %-12s %10.2f s %5.1f%%  pages=%d rows=%d "
+                         "bytes=%d" % (phase, seconds, 100 * seconds / busy,
+                                       pages, rows, size))
+
+        lines.append("")
+        lines.append("Slowest markets:")
+        slowest = sorted(markets.items(), key=lambda m: -sum(m[1].values()))
+        for (rate, market), phase_seconds in slowest[:self.top]:
+            seconds = sum(phase_seconds.values())
+            dominant = max(phase_seconds, key=phase_seconds.get)
+            lines.append("  %-6s %-14s %8.2f s  dominant: %s (%.0f%%)"
+                         % (rate, market, seconds, dominant,
+                            100 * phase_seconds[dominant] / (seconds or 1)))
+        return "\n".join(lines) + "\n"
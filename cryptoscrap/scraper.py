@@ -1,15 +1,20 @@
 import os
 import re
 import time
-import sys
-import socket
 from datetime import datetime
-import pandas as pd
-import logging
-
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+
+from .lazy import LazyModule
+from .logs import default_logger
+from . import client
+from . import storage
+from .profiling import PhaseTimer, PhaseEvent, NULL_PHASE_TIMER, emit
 from .history import histo_day, histo_hour, histo_minute
 from .price import coin_list
 
+pd = LazyModule("pandas")
+
 
 CSV_HEADER = ['time', 'open', 'high', 'low', 'close', 'volumefrom', 'volumeto']
 HISTO_LIMIT = 2000
@@ -21,8 +26,9 @@ COINMARKETCAP_TO_CRYPTOCOMPARE = {"MIOTA": "IOT",
                                   "ETHOS": "BQX"}
 CRYPTOCOMPARE_EXPECTED_ERROR = r"(.*)only available for the last 7 days(.*)"
 CRYPTOCOMPARE_NO_DATA_ERROR = r"Cryptocompare API Error: There is no data for the symbol(.*)"
-REMOTE_SERVER = "www.google.com"  # to check internet connection
 INTERNET_CHECK_RATE = 30 * 60  # 30 minutes
+MAX_CONNECTION_RETRY = 3  # per market, failures without a breaker opening
+RETRY_DELAY = 5  # seconds, backoff base between retries of a market
 
 
 class Scraper():
@@ -30,10 +36,20 @@ class Scraper():
     Scraper to dump easily the CryptoCompare Histo data (day, hour and minutes)
     into csv files.
     """
-    def __init__(self, path_root, logger=None):
+    def __init__(self, path_root, logger=None, compression=None,
+                 hooks=None):
         """
         :param path_root: path where the csv files will be saved
+        :param compression: None (plain csv), "gzip" or "zstd". Updates are
+                            appended as new compressed blocks.
+        :param hooks: list of callables receiving a profiling.PhaseEvent at
+                      the end of each phase of each market (see
+                      profiling.ProfileCollector)
         """
+        self.compression = compression
+        storage.extension(compression)  # fail early on unknown compression
+        self.hooks = list(hooks) if hooks else []
+
         # Set the storing paths
         self.path_root = path_root
         self.path_day = os.path.join(path_root, "day")
@@ -41,20 +57,8 @@ class Scraper():
         self.path_minute = os.path.join(path_root, "minute")
         self.path_coin_ignore = os.path.join(path_root, "coin_ignore_list.csv")
 
-        # Create a stdout logger if None
-        if logger is None:
-            log = logging.getLogger()
-            log.setLevel(logging.INFO)
-
-            handler = logging.StreamHandler(sys.stdout)
-            handler.setLevel(logging.INFO)
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - '
-                                          '%(message)s')
-            handler.setFormatter(formatter)
-            log.addHandler(handler)
-            self.log = log
-        else:
-            self.log = logger
+        # Log to stdout if no logger is given
+        self.log = logger if logger is not None else default_logger()
 
         # Create missing directory
         for directory in [self.path_day, self.path_hour, self.path_minute]:
@@ -62,182 +66,338 @@ class Scraper():
                 os.makedirs(directory)
 
     # Scrap all method
-    def scrap(self, rate, to_curr="BTC", update=True, verbose=1):
+    def scrap(self, rate, to_curr="BTC", update=True, verbose=1, workers=1,
+              synthesize_via=None):
         """
         Scrap all the data of active coins.
 
+        All the markets are scraped in a single pass: the active coin list is
+        retrieved once, and the markets of every quote currency share the
+        same worker pool and HTTP connections.
+
+        If synthesize_via is set (for instance "BTC"), the markets of the
+        other quote currencies are only fetched if they trade directly.
+        The others are built locally from the stored ***-BTC and BTC-<quote>
+        series (see cross_rate), instead of fetching the CryptoCompare
+        conversion through BTC.
+        Finding out that a market does not trade directly costs one
+        tryConversion=false call. The result is cached in
+        not_direct_<quote>.csv (one coin per line, like
+        coin_ignore_list.csv), so later runs synthesize these markets
+        without any call. Remove a coin from that file to fetch its market
+        again, for instance once it trades directly.
+
         :param rate: minute/hour/day
+        :param to_curr: quote currency, or list of quote currencies
         :param update: if set to True, the Scraper will try to append
                         existing data.
+        :param workers: number of markets scraped concurrently
+        :param synthesize_via: intermediate currency of the synthesized
+                               markets, or None to fetch every market
         """
         scrap_coin_func = {
             "minute": self.scrap_coin_minute,
             "hour": self.scrap_coin_hour,
             "day": self.scrap_coin_day
         }
-
-        coinlist = [coin for coin in self.get_active_coin_list(verbose=verbose)
-                    if coin != to_curr]
-        self.log.info("Scrapping %s %s data for %d coins..."
-                      % (to_curr, rate, len(coinlist)))
+        run_start = time.perf_counter()
+        quotes = [to_curr] if isinstance(to_curr, str) else list(to_curr)
+        if synthesize_via is not None and synthesize_via not in quotes:
+            quotes.insert(0, synthesize_via)
+
+        # Markets are scheduled by coin market cap, all quotes of a coin
+        # together. When synthesizing, only direct trading data is fetched
+        # for the markets that can be derived.
+        coinlist = self.get_active_coin_list(verbose=verbose)
+        not_direct = {q: self._read_not_direct(q) for q in quotes
+                      if synthesize_via not in (None, q)}
+        to_synthesize = [(c, q) for c in coinlist for q in not_direct
+                         if c != q and c != synthesize_via
+                         and c in not_direct[q]]
+        markets = [(c, q, synthesize_via in (None, c, q))
+                   for c in coinlist for q in quotes
+                   if c != q and c not in not_direct.get(q, ())]
+        self.log.info("Scrapping %s %s data for %d markets..."
+                      % ("/".join(quotes), rate, len(markets)))
         success = []
-        for c in coinlist:
+        ignored = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._retry_on_disconnect,
+                                       scrap_coin_func[rate], c, q,
+                                       update=update, verbose=verbose,
+                                       try_conversion=conv): (c, q, conv)
+                       for c, q, conv in markets}
+            try:
+                for future in as_completed(futures):
+                    c, q, conv = futures[future]
+                    try:
+                        future.result()
+                        success.append((c, q))
+                    except Exception as e:
+                        no_data = re.match(CRYPTOCOMPARE_NO_DATA_ERROR, str(e))
+                        if no_data and not conv:
+                            # Not traded directly, derive it once fetched
+                            to_synthesize.append((c, q))
+                            with open(self._path_not_direct(q), "a") as f:
+                                f.write(c + "\n")
+                        elif no_data:
+                            # If no data error, add the coin ignore list
+                            if c not in ignored:
+                                ignored.add(c)
+                                with open(self.path_coin_ignore, "a") as f:
+                                    f.write(c + "\n")
+                            self.log.warning("No data for the symbol %s, "
+                                             "coin added to ignore list." % c)
+                        else:
+                            self.log.error("Failed to scrap market %s-%s: %s"
+                                           % (c, q, str(e)))
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                to_synthesize = []
+
+        # Derive the markets not traded directly, sharing the via-quote data
+        df_via = {}
+        synthesized = []
+        for c, q in to_synthesize:
             try:
-                scrap_coin_func[rate](c, to_curr, update=update,
-                                      verbose=verbose)
-                success.append(c)
+                if q not in df_via:
+                    df_via[q] = self.read_market(rate, synthesize_via, q)
+                self.synthesize_coin(rate, c, q, synthesize_via,
+                                     df_via=df_via[q])
+                synthesized.append((c, q))
             except KeyboardInterrupt:
                 break
             except Exception as e:
-                # If no data error, add the coin ignore list
-                if re.match(CRYPTOCOMPARE_NO_DATA_ERROR, str(e)):
-                    with open(self.path_coin_ignore, "a") as f:
-                        f.write(c + "\n")
-                    self.log.warning("No data for the symbol %s, "
-                                     "coin added to ignore list." % c)
-                else:
-                    self.log.error("Failed to scrap coin %s: %s" % (c, str(e)))
-        self.log.info("Successfully scraped %s %s data for %d coins"
-                      % (to_curr, rate, len(success)))
+                self.log.error("Failed to synthesize market %s-%s: %s"
+                               % (c, q, str(e)))
+        self.log.info("Successfully scraped %s %s data for %d markets "
+                      "(%d synthesized)" % ("/".join(quotes), rate,
+                                            len(success) + len(synthesized),
+                                            len(synthesized)))
+        if self.hooks:
+            emit(self.hooks, PhaseEvent(rate, None, "run",
+                                        time.perf_counter() - run_start,
+                                        0, 0, 0), self.log)
+
+    def _path_not_direct(self, to_curr):
+        return os.path.join(self.path_root, "not_direct_%s.csv" % to_curr)
+
+    def _read_not_direct(self, to_curr):
+        """Return the coins known not to trade directly in to_curr."""
+        path = self._path_not_direct(to_curr)
+        if not os.path.isfile(path):
+            return set()
+        with open(path) as f:
+            return set(line.strip() for line in f if line.strip())
 
     # Individual coin scraping methods
-    def scrap_coin_day(self, from_curr, to_curr="BTC", update=True, verbose=1):
+    def scrap_coin_day(self, from_curr, to_curr="BTC", update=True, verbose=1,
+                       try_conversion=True):
         """
         Dump CryptoCompare HistoDay data into a csv.
+
+        If try_conversion = False, only the direct trading data is retrieved.
         """
         if verbose:
             self.log.info("Scraping daily data of market %s-%s..."
                           % (from_curr, to_curr))
-        self.wait_for_internet_connection(INTERNET_CHECK_RATE)
-        filename = from_curr + "-" + to_curr + ".csv"
-        csv_path = os.path.join(self.path_day, filename)
-
-        data = histo_day(from_curr, to_curr, all_data=True)
-        df = pd.DataFrame(data, columns=CSV_HEADER)
-        df["time"] = pd.to_datetime(df["time"], unit='s')
-        # TOFIX: case when volumeto is 0 (last row for instance)
-
-        df.to_csv(csv_path, index=False)
+        market = from_curr + "-" + to_curr
+        with self._phase("day", market, "connectivity"):
+            self.wait_for_internet_connection(INTERNET_CHECK_RATE)
+        csv_path = self.market_path("day", from_curr, to_curr)
+
+        with self._phase("day", market, "fetch") as phase:
+            data = histo_day(from_curr, to_curr, all_data=True,
+                             try_conversion=try_conversion)
+            df = pd.DataFrame(data, columns=CSV_HEADER)
+            phase.pages, phase.rows = 1, len(df)
+        with self._phase("day", market, "trim") as phase:
+            df["time"] = pd.to_datetime(df["time"], unit='s')
+            # TOFIX: case when volumeto is 0 (last row for instance)
+            phase.rows = len(df)
+
+        with self._phase("day", market, "write") as phase:
+            text = df.to_csv(index=False, date_format=DATE_FORMAT)
+            phase.bytes = storage.write(csv_path, text, self.compression)
+            phase.rows = len(df)
 
     def scrap_coin_hour(self, from_curr, to_curr="BTC",
-                        update=True, verbose=1):
+                        update=True, verbose=1, try_conversion=True):
         """
         Dump CryptoCompare HistoHour data into a csv.
 
         If update = True, the scraper will first try to load
         existing data in the root path, and retrieve only the missing
         data from CryptoCompare.
+        If try_conversion = False, only the direct trading data is retrieved.
         """
         if verbose:
             self.log.info("Scraping hourly data of market %s-%s..."
                           % (from_curr, to_curr))
-        self.wait_for_internet_connection(INTERNET_CHECK_RATE)
-        filename = from_curr + "-" + to_curr + ".csv"
-        csv_path = os.path.join(self.path_hour, filename)
-
-        # If csv already exist, load it and retrieve last timestamp
-        df_existing = None
-        ts_end = 0
-        if update and os.path.isfile(csv_path):
-            df_existing = pd.read_csv(csv_path)
-            ts_end = str_to_ts(df_existing.iloc[-1, 0], DATE_FORMAT)
-
-        # Retrieve first chunk of data from CryptoCompare
-        ts = int(time.time())
-        data = histo_hour(from_curr, to_curr, limit=HISTO_LIMIT, to_ts=ts)
-        df = pd.DataFrame(data, columns=CSV_HEADER)
-
-        # Retrieve data from CryptoCompare until enough data have been fetched
-        # i.e. no more data is available (high price = 0), or remaining data
-        # is already in the existing csv
-        while df.loc[0, "high"] > 0 and df.loc[0, "time"] > ts_end:
-            ts = int(df.head(1)["time"])
-
-            data = histo_hour(from_curr, to_curr,
-                              limit=HISTO_LIMIT, to_ts=ts - 1)
-            df2 = pd.DataFrame(data, columns=CSV_HEADER)
-            df = pd.concat([df2, df], axis=0, ignore_index=True)
-
-        # Format data: clean zeros and convert to datetime
-        for idx, row in df.iterrows():
-            if not row[2] == row[3] == 0:
-                df = df.drop(df.index[:idx])
-                break
-        df["time"] = pd.to_datetime(df["time"], unit='s')
-
-        # Merge with existing csv data
-        if df_existing is not None:
-            for idx, row in df.iterrows():
-                if str(row[0]) == str(df_existing.iloc[-1, 0]):
-                    df = df.drop(df.index[:idx + 1])
-                    df = pd.concat([df_existing, df],
-                                   axis=0, ignore_index=True)
-                    break
-
-        df.to_csv(csv_path, index=False)
+        self._scrap_coin_histo("hour", histo_hour, from_curr, to_curr, update,
+                               try_conversion)
 
     def scrap_coin_minute(self, from_curr, to_curr="BTC",
-                          update=True, verbose=1):
+                          update=True, verbose=1, try_conversion=True):
         """
         Dump CryptoCompare HistoMinute data into a csv.
 
         If update = True, the scraper will first try to load
         existing data in the root path, and retrieve only the missing
         data from CryptoCompare.
+        If try_conversion = False, only the direct trading data is retrieved.
         """
         if verbose:
             self.log.info("Scraping minute data of market %s-%s..."
                           % (from_curr, to_curr))
-        self.wait_for_internet_connection(INTERNET_CHECK_RATE)
-        filename = from_curr + "-" + to_curr + ".csv"
-        csv_path = os.path.join(self.path_minute, filename)
+        self._scrap_coin_histo("minute", histo_minute, from_curr, to_curr,
+                               update, try_conversion)
 
-        # If csv already exist, load it and retrieve last timestamp
-        df_existing = None
+    def _scrap_coin_histo(self, rate, histo_func, from_curr, to_curr, update,
+                          try_conversion=True):
+        """
+        Fetch the pages of an hour/minute market, and append the data newer
+        than the last existing row to its csv.
+        """
+        market = from_curr + "-" + to_curr
+        with self._phase(rate, market, "connectivity"):
+            self.wait_for_internet_connection(INTERNET_CHECK_RATE)
+        csv_path = self.market_path(rate, from_curr, to_curr)
+
+        # If csv already exist, retrieve its last timestamp
+        last_time = None
         ts_end = 0
-        if update and os.path.isfile(csv_path):
-            df_existing = pd.read_csv(csv_path)
-            ts_end = str_to_ts(df_existing.iloc[-1, 0], DATE_FORMAT)
+        with self._phase(rate, market, "load"):
+            if update and os.path.isfile(csv_path):
+                last_line = storage.read_last_line(csv_path, self.compression)
+                if last_line and not last_line.startswith(CSV_HEADER[0]):
+                    last_time = pd.Timestamp(last_line.split(",")[0])
+                    ts_end = int(last_time.timestamp())
+
+        with self._phase(rate, market, "fetch") as phase:
+            # Retrieve first chunk of data from CryptoCompare
+            ts = int(time.time())
+            data = histo_func(from_curr, to_curr, limit=HISTO_LIMIT, to_ts=ts,
+                              try_conversion=try_conversion)
+            df = pd.DataFrame(data, columns=CSV_HEADER)
+            phase.pages = 1
+
+            # Retrieve data from CryptoCompare until enough data have been
+            # fetched i.e. no more data is available (high price = 0), or
+            # remaining data is already in the existing csv
+            while df.loc[0, "high"] > 0 and df.loc[0, "time"] > ts_end:
+                ts = int(df.loc[0, "time"])
+
+                try:
+                    data = histo_func(from_curr, to_curr,
+                                      limit=HISTO_LIMIT, to_ts=ts - 1,
+                                      try_conversion=try_conversion)
+                except ValueError as e:
+                    if re.match(CRYPTOCOMPARE_EXPECTED_ERROR, str(e)):
+                        break
+                    raise e
+
+                df2 = pd.DataFrame(data, columns=CSV_HEADER)
+                df = pd.concat([df2, df], axis=0, ignore_index=True)
+                phase.pages += 1
+            phase.rows = len(df)
+
+        # Format data: clean leading zeros and convert to datetime
+        with self._phase(rate, market, "trim") as phase:
+            nonzero = ~((df["high"] == 0) & (df["low"] == 0))
+            df = df.loc[nonzero.idxmax():] if nonzero.any() else df.iloc[0:0]
+            df["time"] = pd.to_datetime(df["time"], unit='s')
+            phase.rows = len(df)
+
+        # Append the new rows to the existing csv data
+        with self._phase(rate, market, "merge") as phase:
+            if last_time is not None:
+                df = df[df["time"] > last_time]
+            phase.rows = len(df)
+
+        with self._phase(rate, market, "write") as phase:
+            if last_time is not None:
+                text = df.to_csv(index=False, header=False,
+                                 date_format=DATE_FORMAT)
+                phase.bytes = storage.append(csv_path, text,
+                                             self.compression)
+            else:
+                text = df.to_csv(index=False, date_format=DATE_FORMAT)
+                phase.bytes = storage.write(csv_path, text, self.compression)
+            phase.rows = len(df)
+
+    def market_path(self, rate, from_curr, to_curr):
+        """
+        Return the path of the file storing a market.
 
-        # Retrieve first chunk of data from CryptoCompare
-        ts = int(time.time())
-        data = histo_minute(from_curr, to_curr, limit=HISTO_LIMIT, to_ts=ts)
-        df = pd.DataFrame(data, columns=CSV_HEADER)
+        :param rate: minute/hour/day
+        """
+        filename = from_curr + "-" + to_curr + storage.extension(
+            self.compression)
+        return os.path.join(self.path_root, rate, filename)
 
-        # Retrieve data from CryptoCompare until enough data have been fetched
-        # i.e. no more data is available (high price = 0), or remaining data
-        # is already in the existing csv
-        while df.loc[0, "high"] > 0 and df.loc[0, "time"] > ts_end:
-            ts = int(df.head(1)["time"])
+    def synthesize_coin(self, rate, from_curr, to_curr, via="BTC",
+                        df_via=None):
+        """
+        Build a market csv locally from the stored from-via and via-to
+        markets, for instance ETH-USD from ETH-BTC and BTC-USD.
+        See cross_rate for the OHLC approximation.
 
-            try:
-                data = histo_minute(from_curr, to_curr,
-                                    limit=HISTO_LIMIT, to_ts=ts - 1)
-            except ValueError as e:
-                if re.match(CRYPTOCOMPARE_EXPECTED_ERROR, str(e)):
-                    break
-                raise e
-
-            df2 = pd.DataFrame(data, columns=CSV_HEADER)
-            df = pd.concat([df2, df], axis=0, ignore_index=True)
-
-        # Format data: clean zeros and convert to datetime
-        for idx, row in df.iterrows():
-            if not row[2] == row[3] == 0:
-                df = df.drop(df.index[:idx])
-                break
-        df["time"] = pd.to_datetime(df["time"], unit='s')
+        If the market was already synthesized, only the rows newer than its
+        last row are appended.
 
-        # Merge with existing csv data
-        if df_existing is not None:
-            for idx, row in df.iterrows():
-                if str(row[0]) == str(df_existing.iloc[-1, 0]):
-                    df = df.drop(df.index[:idx + 1])
-                    df = pd.concat([df_existing, df],
-                                   axis=0, ignore_index=True)
-                    break
+        :param rate: minute/hour/day
+        :param df_via: via-to data, if already loaded
+        """
+        market = from_curr + "-" + to_curr
+        csv_path = self.market_path(rate, from_curr, to_curr)
+        with self._phase(rate, market, "load") as phase:
+            # Times are stored as DATE_FORMAT strings, which sort as dates
+            last_time = None
+            if os.path.isfile(csv_path):
+                last_line = storage.read_last_line(csv_path, self.compression)
+                if last_line and not last_line.startswith(CSV_HEADER[0]):
+                    last_time = last_line.split(",")[0]
+            if df_via is None:
+                df_via = self.read_market(rate, via, to_curr)
+            df_from = self.read_market(rate, from_curr, via)
+            if last_time is not None:
+                df_from = df_from[df_from["time"] > last_time]
+            phase.rows = len(df_from)
+        with self._phase(rate, market, "merge") as phase:
+            df = cross_rate(df_from, df_via)
+            phase.rows = len(df)
+        with self._phase(rate, market, "write") as phase:
+            if last_time is not None:
+                text = df.to_csv(index=False, header=False,
+                                 date_format=DATE_FORMAT)
+                phase.bytes = storage.append(csv_path, text,
+                                             self.compression)
+            else:
+                text = df.to_csv(index=False, date_format=DATE_FORMAT)
+                phase.bytes = storage.write(csv_path, text, self.compression)
+            phase.rows = len(df)
+
+    def read_market(self, rate, from_curr, to_curr):
+        """
+        Load a stored market.
 
-        df.to_csv(csv_path, index=False)
+        :param rate: minute/hour/day
+        :return: pandas.DataFrame
+        """
+        with storage.open_text(self.market_path(rate, from_curr, to_curr),
+                               "r", self.compression) as f:
+            return pd.read_csv(f)
+
+    def _phase(self, rate, market, phase):
+        """
+        Return a context manager timing a phase of a market for the hooks,
+        or a no-op one if there is no hook.
+        """
+        if not self.hooks:
+            return NULL_PHASE_TIMER
+        return PhaseTimer(self.hooks, rate, market, phase, self.log)
 
     def get_active_coin_list(self, verbose=1):
         """
@@ -255,7 +415,7 @@ class Scraper():
 
         # Retrieve active coin list from CoinMarketCap,
         # sorted by marketcap, and remove ignore list
-        df = pd.read_json(COINMARKETCAP_TICKER_URL)
+        df = pd.DataFrame(client.get(COINMARKETCAP_TICKER_URL).json())
         len_CMC = len(df.symbol)
         df = df[~df.symbol.isin(ignore_list[0].values)]
         active_list = df.symbol.tolist()
@@ -286,13 +446,58 @@ class Scraper():
         return True
 
     def wait_for_internet_connection(self, check_rate):
-        while not is_connected(REMOTE_SERVER):
-            self.log.info("No internet connection. Trying again in %d min..."
-                          % int(check_rate / 60))
-            time.sleep(check_rate)
+        """
+        Block while the connection monitor is unhealthy. The connectivity is
+        tracked from the API requests outcomes, so no probe is sent as long
+        as the requests succeed.
+        """
+        client.monitor.wait(check_rate, log=self.log)
+
+    def _retry_on_disconnect(self, func, *args, **kwargs):
+        """
+        Call func, and call it again if it failed on a network error.
+
+        If the failures opened the connection breaker, wait for it to close
+        before retrying: a market is never dropped because of an outage.
+        Otherwise back off, and give up after MAX_CONNECTION_RETRY failures.
+        """
+        retries = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                if not client.monitor.healthy:
+                    self.wait_for_internet_connection(INTERNET_CHECK_RATE)
+                    continue
+                retries += 1
+                if retries >= MAX_CONNECTION_RETRY:
+                    raise
+                time.sleep(RETRY_DELAY * retries)
 
 
 # Utils
+def cross_rate(df_from, df_via):
+    """
+    Build the bars of a market from-to, from the bars of the markets from-via
+    and via-to, aligned on their time (only the common times are kept).
+
+    open and close are the exact products of the two markets. high and low
+    are approximated by the products of the highs and of the lows: both
+    highs (or lows) are not necessarily reached at the same moment, so the
+    synthesized range can only be wider than the real one. volumefrom stays
+    in the from currency, volumeto is converted at the via-to close.
+
+    :return: pandas.DataFrame
+    """
+    df = pd.merge(df_from[CSV_HEADER], df_via[CSV_HEADER], on="time",
+                  suffixes=("", "_via"))
+    for col in ["open", "high", "low", "close"]:
+        df[col] = df[col] * df[col + "_via"]
+    df["volumeto"] = df["volumeto"] * df["close_via"]
+    return df[CSV_HEADER]
+
+
 def ts_to_str(ts):
     """Convert timestamp to datetime string"""
     return datetime.fromtimestamp(int(ts)).strftime(DATE_FORMAT)
@@ -302,17 +507,3 @@ def str_to_ts(date_str, str_format=DATE_FORMAT):
     """Convert datetime string to timestamp"""
     dt = datetime.strptime(date_str, str_format)
     return time.mktime(dt.timetuple())
-
-
-def is_connected(hostname):
-    """Check if internet connection is available"""
-    try:
-        # see if we can resolve the host name -- tells us if there is
-        # a DNS listening
-        host = socket.gethostbyname(hostname)
-        # connect to the host -- tells us if the host is actually
-        # reachable
-        socket.create_connection((host, 80), 2)
-        return True
-    except:
-        return False
@@ -1,4 +1,4 @@
-import requests
+from . import client
 
 __socialurl = 'https://www.cryptocompare.com/api/data/socialstats/?'
 __miningurl = 'https://www.cryptocompare.com/api/data/miningequipment/'
@@ -26,25 +26,11 @@ def mining_equipment():
 
 
 def __get_data(urlbase, id):
-    url = urlbase + 'id=' + str(id)
-    raw_data = requests.get(url)
-    raw_data.encoding = 'utf-8'
-    if raw_data.status_code != 200:
-        raw_data.raise_for_status()
+    data = client.get_json(urlbase + 'id=' + str(id))
+    if data is False:
         return False
-    try:
-        return raw_data.json()['Data']
-    except NameError:
-        raise ValueError('Cannot parse to json.')
+    return data['Data']
 
 
 def __get_url(url):
-    raw_data = requests.get(url)
-    raw_data.encoding = 'utf-8'
-    if raw_data.status_code != 200:
-        raw_data.raise_for_status()
-        return False
-    try:
-        return raw_data.json()
-    except NameError:
-        raise ValueError('Cannot parse to json.')
+    return client.get_json(url)
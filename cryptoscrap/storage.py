@@ -0,0 +1,155 @@
+import gzip
+import io
+import os
+
+
+EXTENSIONS = {None: ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+INDEX_EXTENSION = ".last"  # sidecar holding the last line of compressed files
+TAIL_BLOCK_SIZE = 4096
+
+
+def extension(compression=None):
+    """
+    Return the file extension of a compression.
+
+    :param compression: None, "gzip" or "zstd"
+    """
+    try:
+        return EXTENSIONS[compression]
+    except KeyError:
+        raise ValueError("Unknown compression %s, expected one of %s"
+                         % (compression, list(EXTENSIONS.keys())))
+
+
+def open_text(path, mode="r", compression=None):
+    """
+    Open a (possibly compressed) csv file in text mode.
+
+    In append mode, compressed files get a new gzip member / zstd frame:
+    the existing data is never recompressed, and the file remains readable
+    as a single stream.
+
+    :param mode: "r", "w" or "a"
+    :param compression: None, "gzip" or "zstd"
+    """
+    extension(compression)
+    if compression is None:
+        return open(path, mode, newline="")
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+
+    zstd = __import_zstd()
+    if mode == "r":
+        stream = zstd.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True)
+    else:
+        stream = zstd.ZstdCompressor().stream_writer(
+            open(path, mode + "b"), closefd=True)
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def write(path, text, compression=None):
+    """
+    Write csv text to a file, replacing the existing one.
+
+    :return: size of the file on disk, in bytes
+    """
+    with open_text(path, "w", compression) as f:
+        f.write(text)
+    __write_index(path, text, compression)
+    return os.path.getsize(path)
+
+
+def create_new(directory, name, ext, mode="x"):
+    """
+    Create and open a new file "<name><ext>" in a directory. An existing
+    file is never overwritten: "-1", "-2", ... is added to the name until it
+    is free. The path is the name attribute of the returned file.
+
+    :param mode: "x" (text) or "xb" (binary)
+    """
+    suffix = 0
+    while True:
+        path = os.path.join(directory, name + (
+            "-%d" % suffix if suffix else "") + ext)
+        try:
+            return open(path, mode)
+        except FileExistsError:
+            suffix += 1
+
+
+def append(path, text, compression=None):
+    """
+    Append csv text to a file, as a new compressed block if needed.
+
+    :return: number of bytes added to the file on disk
+    """
+    if not text:
+        return 0
+    size = os.path.getsize(path) if os.path.isfile(path) else 0
+    with open_text(path, "a", compression) as f:
+        f.write(text)
+    __write_index(path, text, compression)
+    return os.path.getsize(path) - size
+
+
+def read_last_line(path, compression=None):
+    """
+    Return the last non empty line of a csv file, without its line ending.
+
+    Plain files are read from the end. Compressed files use the sidecar
+    index written along the last block, and are only fully decompressed
+    if it is missing or out of date.
+    """
+    if compression is None:
+        return __read_tail(path)
+
+    try:
+        with open(path + INDEX_EXTENSION) as f:
+            size, line = f.read().split("\t", 1)
+        if int(size) == os.path.getsize(path):
+            return line
+    except (IOError, ValueError):
+        pass
+
+    last_line = None
+    with open_text(path, "r", compression) as f:
+        for line in f:
+            if line.strip():
+                last_line = line
+    return last_line.rstrip("\r\n") if last_line is not None else None
+
+
+def __read_tail(path):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0:
+            start = max(0, end - TAIL_BLOCK_SIZE)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+            lines = data.strip().splitlines()
+            if len(lines) > 1 or (lines and end == 0):
+                return lines[-1].decode("utf-8").rstrip("\r")
+    return None
+
+
+def __write_index(path, text, compression):
+    if compression is None:
+        return
+    lines = text.strip().splitlines()
+    if not lines:
+        return
+    with open(path + INDEX_EXTENSION, "w") as f:
+        f.write("%d\t%s" % (os.path.getsize(path), lines[-1].rstrip("\r")))
+
+
+def __import_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires the zstandard package "
+                          "(pip install cryptoscrap[zstd])")
+    return zstandard
@@ -9,6 +9,10 @@ setup(name='cryptoscrap',
       packages=['cryptoscrap'],
       install_requires=[
           'requests',
-          'pandas',
       ],
+      extras_require={
+          'pandas': ['pandas'],
+          'zstd': ['zstandard'],
+          'parquet': ['pandas', 'pyarrow'],
+      },
       zip_safe=False)
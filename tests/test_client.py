@@ -0,0 +1,69 @@
+import time
+import threading
+
+import pytest
+
+from cryptoscrap.client import SingleFlight
+
+
+THREADS = 8
+
+
+def run_concurrently(flight, func):
+    """Call flight.do from THREADS threads, return their results/errors"""
+    results = [None] * THREADS
+
+    def call(i):
+        try:
+            results[i] = flight.do("key", func)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,))
+               for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def wait_for_followers(flight):
+    """Block the leader until every other thread waits on its call"""
+    deadline = time.time() + 10
+    while flight.stats()["coalesced"] < THREADS - 1:
+        if time.time() > deadline:
+            pytest.fail("followers never joined the call in flight")
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+
+    def func():
+        wait_for_followers(flight)
+        return object()
+
+    results = run_concurrently(flight, func)
+
+    assert flight.stats() == {"calls": 1, "coalesced": THREADS - 1}
+    assert all(result is results[0] for result in results)
+    assert results[0] is not None
+
+
+def test_leader_error_reaches_every_follower():
+    flight = SingleFlight()
+    error = ValueError("no data")
+
+    def func():
+        wait_for_followers(flight)
+        raise error
+
+    results = run_concurrently(flight, func)
+
+    assert flight.stats() == {"calls": 1, "coalesced": THREADS - 1}
+    assert all(result is error for result in results)
+
+    # The failed call is not kept in flight: the next call runs again
+    assert flight.do("key", lambda: 42) == 42
+    assert flight.stats()["calls"] == 2
@@ -0,0 +1,60 @@
+import logging
+
+import pytest
+
+from cryptoscrap import collector
+from cryptoscrap.collector import SnapshotCollector
+
+
+LOG = logging.getLogger(__name__)
+SOCIAL = {
+    "General": {"Name": "ETH", "Points": 100, "Tags": ["smart"]},
+    "Twitter": {"followers": "2000", "account_creation": None},
+    "Reddit": None,
+    "CodeRepository": {"List": [
+        {"stars": 10, "forks": "3", "url": "a"},
+        {"stars": "5", "forks": None, "open_pull_issues": "n/a"}]},
+}
+
+
+def test_snapshots_in_the_same_second_are_kept(monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(collector, "mining_equipment", lambda: {
+        "MiningData": {"1": {"Name": "miner", "Cost": 5}}})
+    c = SnapshotCollector(str(tmp_path), logger=LOG)
+    paths = [c.snapshot_mining() for _ in range(3)]
+
+    assert len(set(paths)) == 3
+    assert len(c.load_mining()) == 3
+
+
+def test_flatten_social():
+    row = collector.flatten_social(SOCIAL)
+
+    assert row["general_name"] == "ETH"
+    assert row["general_points"] == 100
+    assert "general_tags" not in row
+    assert row["twitter_followers"] == "2000"
+    assert row["twitter_account_creation"] is None
+    assert not [key for key in row if key.startswith("reddit_")]
+    assert row["coderepository_count"] == 2
+    assert row["coderepository_stars"] == 15
+    assert row["coderepository_forks"] == 3
+    assert row["coderepository_open_pull_issues"] == 0
+    assert "coderepository_url" not in row
+
+
+def test_columns_have_a_single_type(monkeypatch, tmp_path):
+    other = dict(SOCIAL, General={"Name": "BTC", "Points": "n/a"},
+                 Twitter={"followers": 3000})
+    stats = {1: SOCIAL, 2: other}
+    monkeypatch.setattr(collector, "social_stats", stats.get)
+    c = SnapshotCollector(str(tmp_path), logger=LOG)
+    df = c.collect_social({"ETH": 1, "BTC": 2})
+
+    assert df["twitter_followers"].tolist() == [2000, 3000]
+    assert df["twitter_followers"].dtype.kind in "if"
+    assert df["general_points"].dtype == "string"
+    assert df["general_points"].tolist() == ["100", "n/a"]
+    assert df["coin_id"].tolist() == [1, 2]
+    assert df["symbol"].dtype == "string"
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNIPPET = """
+import sys
+import %s
+print(",".join(m for m in ["pandas", "numpy"] if m in sys.modules))
+"""
+
+
+@pytest.mark.parametrize("module", ["cryptoscrap.history",
+                                    "cryptoscrap.price",
+                                    "cryptoscrap.social"])
+def test_api_modules_do_not_load_pandas(module):
+    # A fresh interpreter, since this one may already have loaded pandas
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.check_output([sys.executable, "-c", SNIPPET % module],
+                                  env=env, universal_newlines=True)
+    assert out.strip() == ""
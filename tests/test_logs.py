@@ -0,0 +1,16 @@
+import logging
+
+from cryptoscrap import logs
+
+
+def test_default_logger_adds_a_single_handler(monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", [])
+    monkeypatch.setattr(root, "level", root.level)
+    monkeypatch.setattr(logs, "_handler", None)
+
+    for _ in range(3):
+        log = logs.default_logger()
+
+    assert log is root
+    assert root.handlers == [logs._handler]
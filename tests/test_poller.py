@@ -0,0 +1,95 @@
+import os
+import logging
+
+import pytest
+
+from cryptoscrap import poller
+from cryptoscrap import storage
+from cryptoscrap.poller import PricePoller
+
+
+LOG = logging.getLogger(__name__)
+
+
+def quote(price, last_update=1700000000):
+    fields = dict(poller.TICK_FIELDS)
+    raw = {field: 1 for field in fields.values()}
+    raw.update(PRICE=price, LASTUPDATE=last_update)
+    return raw
+
+
+class FakeMarket():
+    """price_multi_full replacement serving the current prices"""
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = 0
+
+    def __call__(self, from_currs, to_currs):
+        self.calls += 1
+        return {"RAW": {f: {t: quote(self.prices[f + "-" + t])
+                            for t in to_currs} for f in from_currs}}
+
+
+@pytest.fixture
+def market(monkeypatch):
+    fake = FakeMarket({"BTC-USD": 100, "ETH-USD": 10})
+    monkeypatch.setattr(poller, "price_multi_full", fake)
+    return fake
+
+
+def read_ticks(p, market_name):
+    path = os.path.join(p.path_tick,
+                        market_name + storage.extension(p.compression))
+    with storage.open_text(path, "r", p.compression) as f:
+        return f.read().splitlines()
+
+
+def test_unchanged_quotes_are_not_stored(market, tmp_path):
+    p = PricePoller(str(tmp_path), [(["BTC", "ETH"], ["USD"])], logger=LOG)
+    p.poll_once()
+    p.poll_once()
+    market.prices["BTC-USD"] = 101
+    p.poll_once()
+    p.flush()
+
+    assert p.stats["ticks"] == 3
+    assert p.stats["duplicates"] == 3
+    assert len(read_ticks(p, "BTC-USD")) == 1 + 2
+    assert len(read_ticks(p, "ETH-USD")) == 1 + 1
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_ticks_are_appended_under_a_single_header(market, tmp_path,
+                                                  compression):
+    p = PricePoller(str(tmp_path), [(["BTC"], ["USD"])],
+                    compression=compression, logger=LOG)
+    for price in [100, 101, 102]:
+        market.prices["BTC-USD"] = price
+        p.poll_once()
+        p.flush()
+
+    lines = read_ticks(p, "BTC-USD")
+    assert lines[0] == ",".join(poller.TICK_HEADER)
+    assert [line.split(",")[2] for line in lines[1:]] == \
+        ["100", "101", "102"]
+    assert p.stats["flushes"] == 3
+
+    p.flush()  # nothing buffered, nothing written
+    assert p.stats["flushes"] == 3
+
+
+def test_memory_is_bounded_when_flushes_fail(market, monkeypatch, tmp_path):
+    def fail(*args, **kwargs):
+        raise IOError("disk full")
+
+    monkeypatch.setattr(storage, "append", fail)
+    p = PricePoller(str(tmp_path), [(["BTC", "ETH"], ["USD"])],
+                    flush_size=4, max_buffer=5, logger=LOG)
+    for price in range(20):
+        market.prices["BTC-USD"] = market.prices["ETH-USD"] = price
+        p.poll_once()
+        assert p._buffered <= p.max_buffer
+
+    assert sum(len(lines) for lines in p._buffer.values()) == p._buffered
+    assert p.stats["dropped"] == p.stats["ticks"] - p._buffered
+    assert p.stats["flushes"] == 0
@@ -0,0 +1,203 @@
+import os
+import logging
+import time
+
+import pytest
+import requests
+
+from cryptoscrap import client
+from cryptoscrap import scraper
+from cryptoscrap import storage
+from cryptoscrap.profiling import ProfileCollector
+from cryptoscrap.scraper import Scraper
+
+
+# Dedicated logger, so that the tests never touch the root logger
+LOG = logging.getLogger(__name__)
+
+
+class FakeResponse():
+    status_code = 200
+    encoding = None
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class OutageSession():
+    """Session failing the first `failures` calls, then serving histo data"""
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise requests.exceptions.ConnectionError("down")
+        now = int(time.time()) // 60 * 60
+        rows = [{"time": now - 60 * i, "open": 1, "high": 2 if i < 10 else 0,
+                 "low": 1 if i < 10 else 0, "close": 1, "volumefrom": 1,
+                 "volumeto": 1} for i in reversed(range(20))]
+        return FakeResponse({"Response": "Success", "Data": rows})
+
+
+@pytest.fixture
+def outage(monkeypatch):
+    def install(failures):
+        session = OutageSession(failures)
+        monkeypatch.setattr(client, "session", session)
+        monkeypatch.setattr(client, "monitor", client.ConnectionMonitor())
+        monkeypatch.setattr(client.rate_limiter, "calls_per_second", None)
+        monkeypatch.setattr(client, "is_connected", lambda *args: True)
+        monkeypatch.setattr(scraper, "RETRY_DELAY", 0)
+        return session
+    return install
+
+
+def test_market_tripping_the_breaker_is_retried(outage, tmp_path, caplog):
+    session = outage(client.FAILURE_THRESHOLD)
+    s = Scraper(str(tmp_path), logger=LOG)
+    s.get_active_coin_list = lambda verbose=1: ["ETH"]
+
+    s.scrap("minute", "BTC", verbose=0)
+
+    assert [r for r in caplog.records if r.levelno >= logging.ERROR] == []
+    assert session.calls > client.FAILURE_THRESHOLD
+    assert client.monitor.healthy
+    df = s.read_market("minute", "ETH", "BTC")
+    assert len(df) == 10
+
+
+def test_flaky_market_is_dropped_after_max_retries(outage, tmp_path):
+    outage(100)
+    client.monitor.failure_threshold = 100  # breaker never opens
+    s = Scraper(str(tmp_path), logger=LOG)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        s._retry_on_disconnect(s.scrap_coin_minute, "ETH", "BTC", verbose=0)
+    assert client.session.calls == scraper.MAX_CONNECTION_RETRY
+
+
+def test_failing_hook_does_not_fail_the_market(outage, tmp_path):
+    outage(0)
+
+    def hook(event):
+        raise RuntimeError("broken hook")
+
+    s = Scraper(str(tmp_path), logger=LOG, hooks=[hook])
+    s.scrap_coin_minute("ETH", "BTC", verbose=0)
+    assert len(s.read_market("minute", "ETH", "BTC")) == 10
+
+
+def test_profile_reports_do_not_overwrite(outage, tmp_path):
+    outage(0)
+    directory = tmp_path / "profiles"
+    s = Scraper(str(tmp_path), logger=LOG,
+                hooks=[ProfileCollector(str(directory))])
+    s.get_active_coin_list = lambda verbose=1: ["ETH"]
+    for _ in range(4):
+        s.scrap("minute", "BTC", verbose=0)
+    assert len(list(directory.iterdir())) == 4
+
+
+class CrossSession(OutageSession):
+    """Session where ETH only trades against BTC"""
+    def __init__(self):
+        OutageSession.__init__(self, 0)
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        if "tryConversion=false" in url and "fsym=ETH" in url:
+            return FakeResponse({"Response": "Error", "Message":
+                                 "There is no data for the symbol ETH ."})
+        return OutageSession.get(self, url, timeout)
+
+
+def test_not_direct_markets_are_cached(outage, monkeypatch, tmp_path,
+                                       caplog):
+    caplog.set_level(logging.INFO, logger=__name__)
+    outage(0)
+    session = CrossSession()
+    monkeypatch.setattr(client, "session", session)
+    s = Scraper(str(tmp_path), logger=LOG)
+    s.get_active_coin_list = lambda verbose=1: ["BTC", "ETH"]
+
+    s.scrap("minute", "USD", verbose=0, synthesize_via="BTC")
+    assert "(1 synthesized)" in caplog.records[-1].getMessage()
+    assert len(s.read_market("minute", "ETH", "USD")) == 10
+
+    del session.urls[:]
+    caplog.clear()
+    s.scrap("minute", "USD", verbose=0, synthesize_via="BTC")
+    assert "(1 synthesized)" in caplog.records[-1].getMessage()
+    assert not [url for url in session.urls
+                if "fsym=ETH" in url and "tsym=USD" in url]
+
+
+class HourSession():
+    """Session serving hourly bars up to `end`, after a zero bar"""
+    def __init__(self, end):
+        self.end = end
+
+    def get(self, url, timeout=None):
+        rows = [{"time": self.end - 3600 * i, "open": 1, "high": 2 if i else 3,
+                 "low": 1, "close": 1, "volumefrom": 1, "volumeto": 1}
+                for i in reversed(range(5))]
+        rows.insert(0, dict(rows[0], time=self.end - 3600 * 5, high=0, low=0))
+        return FakeResponse({"Response": "Success", "Data": rows})
+
+
+def test_midnight_update_keeps_the_time_format(outage, monkeypatch,
+                                               tmp_path):
+    outage(0)
+    midnight = 1700006400  # 2023-11-15 00:00:00 UTC
+    monkeypatch.setattr(client, "session", HourSession(midnight - 3600))
+    s = Scraper(str(tmp_path), logger=LOG, compression="gzip")
+    s.scrap_coin_hour("ETH", "BTC", verbose=0)
+
+    client.session.end = midnight
+    s.scrap_coin_hour("ETH", "BTC", verbose=0)
+
+    path = s.market_path("hour", "ETH", "BTC")
+    assert storage.read_last_line(path, "gzip").startswith(
+        "2023-11-15 00:00:00,")
+    df = s.read_market("hour", "ETH", "BTC")
+    assert df["time"].tolist()[-2:] == ["2023-11-14 23:00:00",
+                                        "2023-11-15 00:00:00"]
+
+
+def test_synthesized_market_is_only_appended(tmp_path):
+    s = Scraper(str(tmp_path), logger=LOG)
+    header = ",".join(scraper.CSV_HEADER) + "\n"
+    bars = ["2023-11-14 %02d:00:00,1,2,1,2,1,1\n" % h for h in range(24)]
+    storage.write(s.market_path("hour", "BTC", "USD"), header + "".join(bars))
+    storage.write(s.market_path("hour", "ETH", "BTC"),
+                  header + "".join(bars[:20]))
+    s.synthesize_coin("hour", "ETH", "USD")
+    path = s.market_path("hour", "ETH", "USD")
+    with open(path, "rb") as f:
+        first_block = f.read()
+
+    storage.append(s.market_path("hour", "ETH", "BTC"), "".join(bars[20:]))
+    s.synthesize_coin("hour", "ETH", "USD")
+
+    with open(path, "rb") as f:
+        assert f.read().startswith(first_block)
+    df = s.read_market("hour", "ETH", "USD")
+    assert df["time"].tolist() == [bar.split(",")[0] for bar in bars]
+    assert df["close"].tolist() == [4] * 24
+
+
+def test_write_phase_counts_the_bytes_on_disk(outage, tmp_path):
+    outage(0)
+    events = []
+    s = Scraper(str(tmp_path), logger=LOG, compression="gzip",
+                hooks=[events.append])
+    s.scrap_coin_minute("ETH", "BTC", verbose=0)
+
+    written = [e.bytes for e in events if e.phase == "write"]
+    assert written == [os.path.getsize(s.market_path("minute", "ETH", "BTC"))]
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from cryptoscrap import storage
+
+
+HEADER = "time,close\n"
+BLOCK_1 = "2023-11-14 22:00:00,1\n2023-11-14 23:00:00,2\n"
+BLOCK_2 = "2023-11-15 00:00:00,3\n"
+
+
+@pytest.fixture(params=[None, "gzip", "zstd"])
+def compression(request):
+    if request.param == "zstd":
+        pytest.importorskip("zstandard")
+    return request.param
+
+
+def test_append_adds_a_block_without_rewriting(compression, tmp_path):
+    path = str(tmp_path / ("market" + storage.extension(compression)))
+    assert storage.write(path, HEADER + BLOCK_1, compression) == \
+        os.path.getsize(path)
+    with open(path, "rb") as f:
+        first_block = f.read()
+
+    added = storage.append(path, BLOCK_2, compression)
+
+    assert added == os.path.getsize(path) - len(first_block)
+    with open(path, "rb") as f:
+        assert f.read().startswith(first_block)
+    with storage.open_text(path, "r", compression) as f:
+        assert f.read() == HEADER + BLOCK_1 + BLOCK_2
+    assert storage.read_last_line(path, compression) == \
+        "2023-11-15 00:00:00,3"
+
+
+def test_sidecar_holds_the_last_line(compression, tmp_path):
+    if compression is None:
+        pytest.skip("plain files are read from their end")
+    path = str(tmp_path / ("market" + storage.extension(compression)))
+    storage.write(path, HEADER + BLOCK_1, compression)
+    storage.append(path, BLOCK_2, compression)
+
+    with open(path + storage.INDEX_EXTENSION) as f:
+        size, line = f.read().split("\t")
+    assert int(size) == os.path.getsize(path)
+    assert line == "2023-11-15 00:00:00,3"
+
+
+def test_stale_sidecar_falls_back_to_the_data(compression, tmp_path):
+    if compression is None:
+        pytest.skip("plain files have no sidecar")
+    path = str(tmp_path / ("market" + storage.extension(compression)))
+    storage.write(path, HEADER + BLOCK_1, compression)
+
+    # Append behind the storage module's back: the sidecar is now stale
+    with storage.open_text(path, "a", compression) as f:
+        f.write(BLOCK_2)
+
+    assert storage.read_last_line(path, compression) == \
+        "2023-11-15 00:00:00,3"
+
+
+def test_read_tail_of_long_plain_file(tmp_path):
+    path = str(tmp_path / "market.csv")
+    lines = ["2023-11-15 00:%02d:00,%d\n" % (i % 60, i) for i in range(2000)]
+    storage.write(path, HEADER + "".join(lines))
+
+    assert storage.read_last_line(path) == lines[-1].rstrip("\n")
+
+
+def test_unknown_compression_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        storage.extension("bz2")
+
+
+def test_create_new_never_overwrites(tmp_path):
+    paths = []
+    for i in range(3):
+        with storage.create_new(str(tmp_path), "report", ".txt") as f:
+            f.write(str(i))
+        paths.append(f.name)
+
+    assert [os.path.basename(p) for p in paths] == \
+        ["report.txt", "report-1.txt", "report-2.txt"]
+    with open(paths[0]) as f:
+        assert f.read() == "0"